@@ -3,13 +3,160 @@ import getpass
 import os
 import time
 from pathlib import Path
+import queue
+import hashlib
+import sys
+import threading
+import stat
+import shlex
+import uuid
+import mmap
 import io
+import tarfile
+import random
+import errno
+import codecs
+import signal
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+UPLOAD_WORKERS = max(1, int(os.environ.get('HAWORKS_UPLOAD_WORKERS', '4')))
+UPLOAD_CHUNK_SIZE = 1 << 20
+EXEC_STREAM_MIN_SIZE = 16 << 20
+TAR_SMALL_FILE_SIZE = 64 * 1024
+TAR_BATCH_FILES = 256
+TAR_BATCH_BYTES = 8 << 20
+UPLOAD_BACKEND = os.environ.get('HAWORKS_UPLOAD_BACKEND', 'paramiko').lower()
+ASYNCSSH_CONCURRENT_FILES = 16
+ASYNCSSH_MAX_REQUESTS = 128
+SSH_WINDOW_SIZE = 64 * 1024 * 1024
+SSH_MAX_PACKET_SIZE = 256 * 1024
+SSH_REKEY_BYTES = 2 ** 40
+SSH_KEEPALIVE_INTERVAL = 30
+UPLOAD_TIMEOUT = 60
+SSH_COMPRESS = os.environ.get('HAWORKS_SSH_COMPRESS', '1').lower() not in ('0', 'false', 'no', 'off')
+AUTO_MKDIR = os.environ.get('HAWORKS_AUTO_MKDIR', '0').lower() in ('1', 'true', 'yes', 'on')
+PROGRESS_INTERVAL = 0.05
+PROGRESS_NAME_WIDTH = 40
+MTIME_TOLERANCE = 2
+REMOTE_BATCH_CHARS = 64 * 1024
+DUP_FAILED_MARKER = '__DUP_FAILED__'
+LIST_MAX_LINES = 200
+BANNER_RULE = '=' * 50
+TEXT_EXTENSIONS = frozenset({'.txt', '.sh', '.py', '.pl', '.conf', '.cfg', '.ini', '.log',
+                             '.xml', '.json', '.yaml', '.yml', '.properties', '.sql', '.js',
+                             '.css', '.html', '.htm', '.md', '.csv', '.tsv', '.bat', '.ps1'})
+TEXT_SUFFIXES = tuple(sorted(TEXT_EXTENSIONS))
+TEXT_SUFFIX_MAX_LEN = max(map(len, TEXT_SUFFIXES))
+PREFERRED_CIPHERS = ('aes128-gcm@openssh.com', 'aes256-gcm@openssh.com', 'chacha20-poly1305@openssh.com')
+PREFERRED_MACS = ('hmac-sha2-256-etm@openssh.com', 'hmac-sha2-512-etm@openssh.com')
+PREFERRED_KEX = ('curve25519-sha256', 'curve25519-sha256@libssh.org')
+PREFERRED_KEYS = ('ssh-ed25519',)
+
+_stop_requested = threading.Event()
+
+def backoff(attempt, base=1.0, cap=30.0):
+    """Exponential retry delay with jitter, between half and all of min(cap, base * 2**attempt)"""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.random() * delay / 2
+
+def request_stop(previous_handler, signum, frame):
+    """SIGINT handler for the upload phase, lets workers finish their current file and skip the rest, a second SIGINT aborts at once"""
+    if _stop_requested.is_set():
+        signal.signal(signal.SIGINT, previous_handler)
+        raise KeyboardInterrupt
+    _stop_requested.set()
+
+def prefer_algorithms(current, preferred, available):
+    """Move the available names from preferred to the front of a paramiko preference tuple"""
+    first = tuple(name for name in preferred if name in available)
+    return first + tuple(name for name in current if name not in first)
+
+def prefer_fast_algorithms():
+    """Put AEAD ciphers, encrypt-then-MAC MACs, curve25519 kex and ed25519 host keys first in paramiko's negotiation order"""
+    transport = paramiko.Transport
+    transport._preferred_ciphers = prefer_algorithms(transport._preferred_ciphers, PREFERRED_CIPHERS, transport._cipher_info)
+    transport._preferred_macs = prefer_algorithms(transport._preferred_macs, PREFERRED_MACS, transport._mac_info)
+    # paramiko leaves curve25519 out of its defaults when the crypto backend lacks it, so only reorder what is there
+    transport._preferred_kex = prefer_algorithms(transport._preferred_kex, PREFERRED_KEX, transport._preferred_kex)
+    transport._preferred_keys = prefer_algorithms(transport._preferred_keys, PREFERRED_KEYS, transport._preferred_keys)
+
+def tune_transport(transport):
+    """Raise the channel window and packet size defaults, must run before channels are opened"""
+    transport.default_window_size = SSH_WINDOW_SIZE
+    transport.default_max_packet_size = SSH_MAX_PACKET_SIZE
+    transport.packetizer.REKEY_BYTES = SSH_REKEY_BYTES
+
+def is_client_alive(client):
+    """Check whether an SSH client still has an active, authenticated transport"""
+    transport = client.get_transport() if client else None
+    return bool(transport and transport.is_active() and transport.is_authenticated())
+
+def wait_exit_status(channel, timeout):
+    """Like channel.recv_exit_status(), but raise TimeoutError instead of waiting forever on a stalled command"""
+    if not channel.status_event.wait(timeout):
+        raise TimeoutError(f"no exit status after {timeout} seconds")
+    return channel.exit_status
+
+def is_session_alive(session):
+    """Check whether a session still has an active, authenticated target transport"""
+    return is_client_alive(session.get('target_ssh'))
+
+def close_session(session):
+    """Close every SFTP channel and SSH client held by a session"""
+    for channel in session.get('sftp_channels') or []:
+        try:
+            channel.close()
+        except:
+            pass
+    
+    for name in ('shell', 'sftp', 'target_ssh', 'jump_ssh'):
+        try:
+            if session.get(name):
+                session[name].close()
+        except:
+            pass
+
+_connect_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='haworks-connect')
+
+def new_ssh_client():
+    """Create an SSH client that accepts unknown host keys"""
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    return client
+
+def connect_jump_client(jump_host, jump_user, jump_password):
+    """Open the jump server connection, runs in the background while the user types"""
+    jump_ssh = new_ssh_client()
+    jump_ssh.connect(jump_host, username=jump_user, password=jump_password, timeout=30)
+    # the target connection rides on a channel of this transport, so it needs the same window
+    tune_transport(jump_ssh.get_transport())
+    return jump_ssh
+
+def open_remote_shell(transport):
+    """Start the persistent /bin/sh that run_remote feeds commands to"""
+    shell = transport.open_session()
+    shell.settimeout(30)
+    shell.exec_command('/bin/sh')
+    return shell
+
+def close_abandoned_client(future):
+    """Close a client whose background connect finished after the attempt was abandoned"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
 def upload_via_jump_server_continuous():
     """Continuous SFTP upload program with automatic dos2unix conversion"""
     
     print("=== CONTINUOUS SFTP UPLOAD VIA JUMP SERVER ===")
     print("This program automatically converts text files from DOS to Unix line endings.\n")
+    prefer_fast_algorithms()
     
     connection_cache = {
         'jump_password': None,
@@ -17,57 +164,188 @@ def upload_via_jump_server_continuous():
         'jump_ssh': None,
         'target_ssh': None,
         'sftp': None,
-        'connected': False,
-        'text_extensions': {'.txt', '.sh', '.py', '.pl', '.conf', '.cfg', '.ini', '.log', 
-                          '.xml', '.json', '.yaml', '.yml', '.properties', '.sql', '.js', 
-                          '.css', '.html', '.htm', '.md', '.csv', '.tsv', '.bat', '.ps1'}
+        'sftp_channels': [],
+        'shell': None,
+        'login': None,
+        'remote_dirs': None,
+        'writable_paths': set(),
+        'connected': False
     }
     
-    def is_text_file(file_path):
-        """Check if file should be converted based on extension"""
-        return file_path.suffix.lower() in connection_cache['text_extensions']
+    def convert_dos2unix_stream(local_file_path):
+        """Convert DOS line endings to Unix during upload, returns an iterator of converted chunks or None for files that look binary or have no CRLF"""
+        # errors propagate so the caller records them with the file's failure instead of printing from a worker
+        f = open(local_file_path, 'rb')
+        try:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if b'\0' in chunk[:1024]:
+                needs_conversion = False
+            elif b'\r\n' in chunk:
+                needs_conversion = True
+            elif len(chunk) < UPLOAD_CHUNK_SIZE:
+                needs_conversion = False
+            else:
+                # already Unix formatted files are common, so scan the rest in C before converting anything
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    needs_conversion = mapped.find(b'\r\n', len(chunk) - 1) != -1
+        except Exception:
+            f.close()
+            raise
+        
+        if not needs_conversion:
+            f.close()
+            return None
+        return convert_chunks(f, chunk)
+    
+    def convert_chunks(f, chunk):
+        """Yield 1 MiB chunks of a file with CRLF replaced by LF, starting from an already read first chunk"""
+        with f:
+            pending = b''
+            while chunk:
+                chunk = pending + chunk
+                # a trailing \r may pair with a \n at the start of the next chunk
+                pending = b'\r' if chunk.endswith(b'\r') else b''
+                yield chunk[:len(chunk) - len(pending)].replace(b'\r\n', b'\n')
+                chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if pending:
+                yield pending
     
-    def is_binary_file(file_path):
-        """Quick binary file detection to avoid converting binary files"""
+    def list_remote_dir(sftp, remote_dir):
+        """Map names to SFTP attributes for a remote directory, or None if it cannot be listed"""
         try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                return b'\0' in chunk
-        except:
-            return False
+            return {attr.filename: attr for attr in sftp.listdir_attr(remote_dir)}
+        except IOError:
+            return None
     
-    def convert_dos2unix_stream(local_file_path):
-        """Convert DOS line endings to Unix during upload"""
+    def make_remote_dir(sftp, remote_dir):
+        """Create a remote directory, returns False if it already existed"""
         try:
-            print(f"    → Converting DOS to Unix line endings...")
-            with open(local_file_path, 'rb') as f:
-                content = f.read()
+            sftp.mkdir(remote_dir)
+            return True
+        except IOError as e:
+            if e.errno == errno.EEXIST:
+                return False
+            # paramiko only sets errno for a few SFTP status codes, so confirm with a stat
             try:
-                text_content = content.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    text_content = content.decode('latin-1')
-                    print(f"      (using latin-1 encoding)")
-                except UnicodeDecodeError:
-                    print(f"      (cannot decode - uploading as binary)")
-                    return None
-            
-            original_lines = text_content.count('\r\n')
-            unix_content = text_content.replace('\r\n', '\n')
-            
-            unix_bytes = unix_content.encode('utf-8')
-            unix_file_obj = io.BytesIO(unix_bytes)
-            
-            if original_lines > 0:
-                print(f"      ✓ Converted {original_lines} DOS line endings")
-            else:
-                print(f"      → Already Unix format")
+                if stat.S_ISDIR(sftp.stat(remote_dir).st_mode):
+                    return False
+            except IOError:
+                pass
+            raise
+    
+    def is_remote_up_to_date(remote_attr, local_stat, text_file):
+        """Check whether a remote file already matches the local one by size and mtime"""
+        if remote_attr.st_mode is None or not stat.S_ISREG(remote_attr.st_mode):
+            return False
+        if remote_attr.st_mtime is None or abs(remote_attr.st_mtime - local_stat.st_mtime) >= MTIME_TOLERANCE:
+            return False
+        if text_file:
+            # dos2unix only ever shrinks a file, so the remote copy may be smaller
+            return remote_attr.st_size <= local_stat.st_size
+        return remote_attr.st_size == local_stat.st_size
+    
+    def put_pipelined(sftp, local_file_path, remote_path):
+        """Upload a local file from a memory map in large pipelined writes instead of waiting on every chunk"""
+        with open(local_file_path, 'rb') as local_file, \
+                sftp.open(remote_path, 'wb', bufsize=0) as remote_file:
+            remote_file.set_pipelined(True)
+            size = os.fstat(local_file.fileno()).st_size
+            if size == 0:
+                return 0
             
-            return unix_file_obj
+            mapped = mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                view = memoryview(mapped)
+                write = remote_file.write
+                stop_requested = _stop_requested.is_set
+                for offset in range(0, size, UPLOAD_CHUNK_SIZE):
+                    if stop_requested():
+                        raise InterruptedError("upload interrupted")
+                    write(view[offset:offset + UPLOAD_CHUNK_SIZE])
+                view.release()
+            finally:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # a failed write can leave a slice alive in the traceback; it is unmapped with it
+                    pass
+        return size
+    
+    def put_via_exec(transport, local_file_path, remote_path):
+        """Stream a local file into cat on the target, avoiding SFTP request framing, returns the number of bytes sent"""
+        channel = transport.open_session()
+        channel.settimeout(UPLOAD_TIMEOUT)
+        try:
+            channel.exec_command(f"cat > {shlex.quote(remote_path)}")
+            stop_requested = _stop_requested.is_set
+            with open(local_file_path, 'rb') as local_file:
+                size = os.fstat(local_file.fileno()).st_size
+                if size:
+                    # send slices of a memory map so multi-GB files are never copied chunk by chunk
+                    mapped = mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        view = memoryview(mapped)
+                        for offset in range(0, size, UPLOAD_CHUNK_SIZE):
+                            if stop_requested():
+                                raise InterruptedError("upload interrupted")
+                            channel.sendall(view[offset:offset + UPLOAD_CHUNK_SIZE])
+                        view.release()
+                    finally:
+                        try:
+                            mapped.close()
+                        except BufferError:
+                            pass
             
-        except Exception as e:
-            print(f"      ✗ Conversion failed: {e}")
-            return None
+            channel.shutdown_write()
+            status = wait_exit_status(channel, UPLOAD_TIMEOUT)
+            if status != 0:
+                error = channel.recv_stderr(4096).decode(errors='replace').strip()
+                raise IOError(f"cat exited with status {status}: {error}")
+        finally:
+            channel.close()
+        return size
+    
+    def put_chunks_pipelined(sftp, chunks, remote_path):
+        """Upload an iterator of byte chunks in pipelined writes, returns the number of bytes sent"""
+        size = 0
+        stop_requested = _stop_requested.is_set
+        with sftp.open(remote_path, 'wb', bufsize=0) as remote_file:
+            remote_file.set_pipelined(True)
+            write = remote_file.write
+            for chunk in chunks:
+                if stop_requested():
+                    raise InterruptedError("upload interrupted")
+                write(chunk)
+                size += len(chunk)
+        return size
+    
+    def start_progress_reporter(progress, total, total_bytes):
+        """Print upload progress from one background thread, returns a function that stops it"""
+        finished = threading.Event()
+        
+        def report():
+            while True:
+                done = finished.wait(PROGRESS_INTERVAL)
+                with progress['lock']:
+                    ok, failed, size = progress['ok'], progress['fail'], progress['bytes']
+                line = f"\rUploaded {ok}/{total} ({size / (1 << 20):.1f}/{total_bytes / (1 << 20):.1f} MB)"
+                if failed:
+                    line += f", {failed} failed"
+                name = "" if done else os.path.basename(progress['current'])[:PROGRESS_NAME_WIDTH]
+                # pad so a shorter name fully overwrites the previous one
+                sys.stdout.write(f"{line}  {name:<{PROGRESS_NAME_WIDTH}}" + ("\n" if done else ""))
+                sys.stdout.flush()
+                if done:
+                    return
+        
+        reporter = threading.Thread(target=report, daemon=True)
+        reporter.start()
+        
+        def stop():
+            finished.set()
+            reporter.join()
+        
+        return stop
     
     def get_connection_details():
         """Get connection details from user"""
@@ -89,107 +367,157 @@ def upload_via_jump_server_continuous():
                 print(f"Error in connection setup: {e}. Trying again...")
                 continue
     
+    def connect_jump(jump_host, jump_user):
+        """Start the jump server login in the background, returns None when the current jump connection is still alive"""
+        if is_client_alive(connection_cache['jump_ssh']):
+            return None
+        
+        if connection_cache['jump_password'] is None:
+            connection_cache['jump_password'] = getpass.getpass(f"Password for {jump_user}@{jump_host} (jump server): ")
+        
+        print(f"Connecting to jump server: {jump_host}")
+        return _connect_executor.submit(connect_jump_client, jump_host, jump_user, connection_cache['jump_password'])
+    
+    def connect_target(jump_ssh, target_ssh, target_host, target_user):
+        """Tunnel through the jump connection and log in to the target, returns the target side of a session"""
+        print(f"Creating tunnel to target VM: {target_host}")
+        jump_transport = jump_ssh.get_transport()
+        dest_addr = (target_host, 22)
+        local_addr = ('127.0.0.1', 22)
+        channel = jump_transport.open_channel("direct-tcpip", dest_addr, local_addr)
+        print("✓ Tunnel created")
+        
+        try:
+            print(f"Connecting to target VM through tunnel...")
+            target_ssh.connect(target_host, username=target_user, password=connection_cache['target_password'], sock=channel, timeout=30, compress=SSH_COMPRESS)
+            print("✓ Connected to target VM")
+            
+            target_transport = target_ssh.get_transport()
+            tune_transport(target_transport)
+            target_transport.set_keepalive(SSH_KEEPALIVE_INTERVAL)
+            sftp = target_ssh.open_sftp()
+            print("✓ SFTP session established")
+            
+            shell = open_remote_shell(target_transport)
+        except:
+            target_ssh.close()
+            raise
+        
+        return {
+            'target_ssh': target_ssh,
+            'sftp': sftp,
+            'sftp_channels': [],
+            'shell': shell,
+            'remote_dirs': None,
+            'writable_paths': set()
+        }
+    
     def safe_connect(jump_host, jump_user, target_host, target_user):
         """Safely establish connection with continuous retry on failure"""
-        connected = False
-
-        while not connected:
+        retry_count = 0
+        while True:
+            jump_future = None
             try:
-                if connection_cache['jump_password'] is None:
-                    try:
-                        connection_cache['jump_password'] = getpass.getpass(f"Password for {jump_user}@{jump_host} (jump server): ")
-                    except KeyboardInterrupt:
-                        print("\nPassword entry interrupted. Trying again...")
-                        continue
+                jump_future = connect_jump(jump_host, jump_user)
                 
                 if connection_cache['target_password'] is None:
-                    try:
-                        connection_cache['target_password'] = getpass.getpass(f"Password for {target_user}@{target_host} (target VM): ")
-                    except KeyboardInterrupt:
-                        print("\nPassword entry interrupted. Trying again...")
-                        continue
-
-                print(f"Connecting to jump server: {jump_host}")
-                jump_ssh = paramiko.SSHClient()
-                jump_ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                jump_ssh.connect(jump_host, username=jump_user, password=connection_cache['jump_password'], timeout=30)
-                print("✓ Connected to jump server")
-                
-                print(f"Creating tunnel to target VM: {target_host}")
-                jump_transport = jump_ssh.get_transport()
-                dest_addr = (target_host, 22)
-                local_addr = ('127.0.0.1', 22)
-                channel = jump_transport.open_channel("direct-tcpip", dest_addr, local_addr)
-                print("✓ Tunnel created")
-                
-                print(f"Connecting to target VM through tunnel...")
-                target_ssh = paramiko.SSHClient()
-                target_ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                target_ssh.connect(target_host, username=target_user, password=connection_cache['target_password'], sock=channel, timeout=30)
-                print("✓ Connected to target VM")
-                
-                sftp = target_ssh.open_sftp()
-                print("✓ SFTP session established")
-                connected = True
-                
-                connection_cache.update({
-                    'jump_ssh': jump_ssh,
-                    'target_ssh': target_ssh,
-                    'sftp': sftp,
-                    'connected': True
-                })
+                    connection_cache['target_password'] = getpass.getpass(f"Password for {target_user}@{target_host} (target VM): ")
+                
+                if jump_future is None:
+                    print("✓ Reusing jump server connection")
+                else:
+                    jump_ssh = jump_future.result()
+                    jump_future = None
+                    jump_ssh.get_transport().set_keepalive(SSH_KEEPALIVE_INTERVAL)
+                    connection_cache['jump_ssh'] = jump_ssh
+                    print("✓ Connected to jump server")
+                
+                session = connect_target(connection_cache['jump_ssh'], new_ssh_client(), target_host, target_user)
+                connection_cache.update(session, login=(jump_host, jump_user, target_host, target_user), connected=True)
                 
                 return True
                 
             except paramiko.AuthenticationException as e:
                 print(f"✗ Authentication failed: {e}")
                 print("Clearing stored passwords...")
-                connection_cache['jump_password'] = None
+                if not is_client_alive(connection_cache['jump_ssh']):
+                    connection_cache['jump_password'] = None
                 connection_cache['target_password'] = None
-                if not connected:
-                    print(f"Retrying authentication...")
-                    time.sleep(2)
-                continue
+                print(f"Retrying authentication...")
+                time.sleep(backoff(retry_count))
+                retry_count += 1
                 
             except KeyboardInterrupt:
                 print("\nConnection interrupted. Trying again...")
-                continue
                 
             except Exception as e:
                 print(f"✗ Connection failed: {e}")
-                if not connected:
-                    print(f"Retrying connection...")
-                    time.sleep(2)
-                continue
-        return False
+                delay = backoff(retry_count)
+                print(f"Retrying connection in {delay:.1f} seconds...")
+                time.sleep(delay)
+                retry_count += 1
+            
+            if jump_future is not None:
+                jump_future.add_done_callback(close_abandoned_client)
     
-    def safe_disconnect():
-        """Safely close all connections"""
-        try:
-            if connection_cache['sftp']:
-                connection_cache['sftp'].close()
-        except:
-            pass
-        
-        try:
-            if connection_cache['target_ssh']:
-                connection_cache['target_ssh'].close()
-        except:
-            pass
-        
-        try:
-            if connection_cache['jump_ssh']:
-                connection_cache['jump_ssh'].close()
-        except:
-            pass
+    def safe_disconnect(keep_jump=False):
+        """Safely close all connections, optionally keeping a jump connection that is still alive"""
+        jump_ssh = connection_cache['jump_ssh']
+        keep_jump = keep_jump and is_client_alive(jump_ssh)
+        close_session(dict(connection_cache, jump_ssh=None) if keep_jump else connection_cache)
         
         connection_cache.update({
-            'jump_ssh': None,
+            'jump_ssh': jump_ssh if keep_jump else None,
             'target_ssh': None,
             'sftp': None,
+            'sftp_channels': [],
+            'shell': None,
+            'remote_dirs': None,
+            'writable_paths': set(),
             'connected': False
         })
     
+    def run_remote(command, stream=None):
+        """Run a command on the persistent remote shell and return its combined output, or write it to stream as it arrives"""
+        shell = connection_cache['shell']
+        if shell is None:
+            # a failed command drops the shell, so start a fresh one on the same connection
+            if not is_client_alive(connection_cache['target_ssh']):
+                raise ConnectionError("connection to the target VM was lost")
+            shell = connection_cache['shell'] = open_remote_shell(connection_cache['target_ssh'].get_transport())
+        sentinel = f"__END_{uuid.uuid4().hex[:8]}__"
+        try:
+            shell.sendall(f"{{ {command}\n}} 2>&1\necho {sentinel}\n".encode())
+            output = b''
+            marker = sentinel.encode()
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            while True:
+                end = output.find(marker)
+                if end != -1:
+                    if stream is None:
+                        return output[:end].decode()
+                    stream.write(decoder.decode(output[:end], final=True))
+                    stream.flush()
+                    return ''
+                if stream is not None and len(output) >= len(marker):
+                    # hold back just enough bytes to still spot a sentinel split across reads
+                    keep = len(output) - len(marker) + 1
+                    stream.write(decoder.decode(output[:keep]))
+                    stream.flush()
+                    output = output[keep:]
+                data = shell.recv(32768)
+                if not data:
+                    raise EOFError("remote shell closed")
+                output += data
+        except Exception:
+            # the shell may still owe us output, so never reuse it after a failure
+            connection_cache['shell'] = None
+            try:
+                shell.close()
+            except:
+                pass
+            raise
+    
     def get_local_path():
         """Get and validate local path - keep trying until valid"""
         while True:
@@ -225,18 +553,22 @@ def upload_via_jump_server_continuous():
                 print("Please try again.")
                 continue
     
+    def get_remote_dirs():
+        """Return the remote working and home directories, fetched once per session"""
+        if connection_cache['remote_dirs'] is None:
+            remote_dirs = tuple(run_remote('echo "$PWD"; echo "$HOME"').splitlines())
+            if len(remote_dirs) != 2 or not all(remote_dirs):
+                raise ValueError(f"unexpected reply {remote_dirs!r}")
+            connection_cache['remote_dirs'] = remote_dirs
+        return connection_cache['remote_dirs']
+    
     def get_target_path():
         """Get and validate target path - keep trying until valid"""
+        writable_paths = connection_cache['writable_paths']
         while True:
             try:
-                target_ssh = connection_cache['target_ssh']
-
                 try:
-                    stdin, stdout, stderr = target_ssh.exec_command('pwd')
-                    current_dir = stdout.read().decode().strip()
-                    
-                    stdin, stdout, stderr = target_ssh.exec_command('echo $HOME')
-                    home_dir = stdout.read().decode().strip()
+                    current_dir, home_dir = get_remote_dirs()
                     
                     print(f"\n=== TARGET PATH SELECTION ===")
                     print(f"Current directory: {current_dir}")
@@ -265,36 +597,49 @@ def upload_via_jump_server_continuous():
                     target_path = current_dir
                 elif user_input.lower() == "list":
                     try:
-                        stdin, stdout, stderr = target_ssh.exec_command(f'ls -la "{current_dir}"')
-                        listing = stdout.read().decode()
                         print(f"\nContents of {current_dir}:")
-                        print(listing)
+                        run_remote(f'ls -la -- {shlex.quote(current_dir)} | head -n {LIST_MAX_LINES}', stream=sys.stdout)
                     except Exception as e:
                         print(f"Error listing directory: {e}")
                     continue
                 elif user_input == "~":
                     target_path = home_dir
                 else:
-                    if user_input.startswith('~'):
-                        target_path = user_input.replace('~', home_dir)
+                    if user_input.startswith('~/'):
+                        # only the leading ~ is the home directory; a ~ later in the path is a literal name
+                        target_path = home_dir + user_input[1:]
                     else:
                         target_path = user_input
                 
+                if target_path in writable_paths:
+                    print(f"✓ Path is valid and writable: {target_path}")
+                    return target_path
+                
+                quoted_path = shlex.quote(target_path)
                 try:
-                    stdin, stdout, stderr = target_ssh.exec_command(f'test -d "{target_path}" && echo "EXISTS" || echo "NOT_EXISTS"')
-                    exists_check = stdout.read().decode().strip()
+                    check = f'p={quoted_path}; if [ -d "$p" ]; then [ -w "$p" ] && echo OK_W || echo OK_RO; '
+                    if AUTO_MKDIR:
+                        check += 'elif mkdir -p -- "$p"; then echo CREATED; '
+                    check += 'else echo NONE; fi'
+                    error, _, path_state = run_remote(check).strip().rpartition('\n')
                     
-                    if exists_check == "EXISTS":
-                        stdin, stdout, stderr = target_ssh.exec_command(f'test -w "{target_path}" && echo "WRITABLE" || echo "NOT_WRITABLE"')
-                        writable_check = stdout.read().decode().strip()
-                        
-                        if writable_check == "WRITABLE":
+                    if path_state == "CREATED":
+                        print(f"✓ Created directory: {target_path}")
+                        writable_paths.add(target_path)
+                        return target_path
+                    elif path_state in ("OK_W", "OK_RO"):
+                        if path_state == "OK_W":
                             print(f"✓ Path is valid and writable: {target_path}")
+                            writable_paths.add(target_path)
                             return target_path
                         else:
                             print(f"✗ Path exists but is not writable: {target_path}")
                             print("Please choose a different path.")
                             continue
+                    elif AUTO_MKDIR:
+                        print(f"✗ Failed to create directory: {error or target_path}")
+                        print("Please try a different path.")
+                        continue
                     else:
                         print(f"✗ Path does not exist: {target_path}")
                         try:
@@ -305,10 +650,10 @@ def upload_via_jump_server_continuous():
                             
                         if create_choice in ['y', 'yes']:
                             try:
-                                stdin, stdout, stderr = target_ssh.exec_command(f'mkdir -p "{target_path}"')
-                                error = stderr.read().decode().strip()
+                                error = run_remote(f'mkdir -p -- {quoted_path}').strip()
                                 if not error:
                                     print(f"✓ Successfully created directory: {target_path}")
+                                    writable_paths.add(target_path)
                                     return target_path
                                 else:
                                     print(f"✗ Failed to create directory: {error}")
@@ -322,11 +667,16 @@ def upload_via_jump_server_continuous():
                             print("Please choose an existing directory.")
                             continue
                 
+                except ConnectionError:
+                    raise
                 except Exception as e:
                     print(f"✗ Error validating path: {e}")
                     print("Please try a different path.")
                     continue
                 
+            except ConnectionError:
+                # the main loop notices the dead connection and reconnects
+                raise
             except Exception as e:
                 print(f"✗ Error in path selection: {e}")
                 print("Trying again...")
@@ -336,85 +686,476 @@ def upload_via_jump_server_continuous():
     def perform_upload(local_path, target_base_path):
         """Perform upload with automatic dos2unix conversion"""
         try:
-            sftp = connection_cache['sftp']
+            sftp, target_ssh = connection_cache['sftp'], connection_cache['target_ssh']
             target_dir = f"{target_base_path}/{local_path.name}"
             
-            print(f"\nCreating target directory: {target_dir}")
-            try:
-                sftp.mkdir(target_dir)
-                print(f"✓ Created directory: {target_dir}")
-            except Exception as e:
-                if "File exists" in str(e):
-                    print(f"✓ Directory already exists: {target_dir}")
-                else:
+            remote_listing = list_remote_dir(sftp, target_dir)
+            if remote_listing is not None:
+                print(f"\n✓ Directory already exists: {target_dir}")
+            else:
+                remote_listing = {}
+                print(f"\nCreating target directory: {target_dir}")
+                try:
+                    if make_remote_dir(sftp, target_dir):
+                        print(f"✓ Created directory: {target_dir}")
+                    else:
+                        print(f"✓ Directory already exists: {target_dir}")
+                except IOError as e:
                     print(f"✗ Failed to create directory: {e}")
                     return False
             
-            def upload_recursive(local_dir, remote_dir):
-                uploaded_count = 0
+            existing_remote_files = set()
+            
+            def collect_upload_tree(local_root, remote_root, root_listing):
+                """Walk the local tree, creating remote directories and collecting files that need uploading"""
+                files = []
                 failed_count = 0
-                converted_count = 0
+                skipped_count = 0
+                new_dirs = []
+                pending = [(os.fspath(local_root), remote_root, root_listing)]
+                add_file = files.append
+                add_pending = pending.append
                 
-                try:
-                    for item in local_dir.iterdir():
-                        try:
-                            local_item = local_dir / item.name
-                            remote_item = f"{remote_dir}/{item.name}"
-                            
-                            if item.is_file():
-                                print(f"Uploading: {item.name}")
-                            
-                                should_convert = is_text_file(item) and not is_binary_file(item)
-                                
-                                if should_convert:
-                                    print(f"  → Text file detected, applying dos2unix conversion")
-                                    converted_file = convert_dos2unix_stream(local_item)
-                                    
-                                    if converted_file:
-                                        sftp.putfo(converted_file, remote_item)
-                                        converted_file.close()
-                                        print(f"  ✓ Uploaded with conversion: {item.name}")
-                                        converted_count += 1
-                                    else:
-                                        print(f"  → Conversion failed, uploading original file")
-                                        sftp.put(str(local_item), remote_item)
-                                        print(f"  ✓ Uploaded (original): {item.name}")
-                                else:
-                                    sftp.put(str(local_item), remote_item)
-                                    print(f"  ✓ Uploaded: {item.name}")
-                                
-                                uploaded_count += 1
-                                
-                            elif item.is_dir():
-                                print(f"Creating subdirectory: {item.name}")
+                while pending:
+                    local_dir, remote_dir, listing = pending.pop()
+                    if listing is None:
+                        listing = list_remote_dir(sftp, remote_dir) or {}
+                    lookup = listing.get
+                    
+                    try:
+                        with os.scandir(local_dir) as entries:
+                            for entry in entries:
+                                name = entry.name
                                 try:
-                                    sftp.mkdir(remote_item)
-                                except Exception as e:
-                                    if "File exists" not in str(e):
-                                        print(f"✗ Failed to create subdirectory: {e}")
-                                        failed_count += 1
-                                        continue
-                                
-                                sub_uploaded, sub_failed, sub_converted = upload_recursive(local_item, remote_item)
-                                uploaded_count += sub_uploaded
-                                failed_count += sub_failed
-                                converted_count += sub_converted
+                                    if entry.is_file():
+                                        local_stat = entry.stat()
+                                        # only the tail can hold a listed suffix, so lowercase just that slice
+                                        should_convert = name[-TEXT_SUFFIX_MAX_LEN:].lower().endswith(TEXT_SUFFIXES)
+                                        remote_attr = lookup(name)
+                                        if remote_attr and is_remote_up_to_date(remote_attr, local_stat, should_convert):
+                                            skipped_count += 1
+                                            continue
+                                        remote_item = f"{remote_dir}/{name}"
+                                        if remote_attr:
+                                            existing_remote_files.add(remote_item)
+                                        add_file((entry.path, remote_item, local_stat, should_convert))
+                                    
+                                    elif entry.is_dir():
+                                        remote_item = f"{remote_dir}/{name}"
+                                        remote_attr = lookup(name)
+                                        if remote_attr and remote_attr.st_mode is not None and stat.S_ISDIR(remote_attr.st_mode):
+                                            add_pending((entry.path, remote_item, None))
+                                            continue
+                                        
+                                        new_dirs.append(remote_item)
+                                        add_pending((entry.path, remote_item, {}))
                                 
+                                except OSError as e:
+                                    print(f"✗ Failed to process {name}: {e}")
+                                    failed_count += 1
+                    
+                    except OSError as e:
+                        print(f"✗ Error during directory traversal: {e}")
+                        failed_count += 1
+                
+                return files, new_dirs, failed_count, skipped_count
+            
+            def create_remote_dirs(remote_dirs):
+                """Create all missing remote directories with as few mkdir -p calls as possible"""
+                failed_count = 0
+                batch = []
+                batch_chars = 0
+                for index, remote_dir in enumerate(remote_dirs):
+                    batch.append(remote_dir)
+                    batch_chars += len(remote_dir) + 3
+                    if batch_chars < REMOTE_BATCH_CHARS and index < len(remote_dirs) - 1:
+                        continue
+                    
+                    try:
+                        error = run_remote(f"mkdir -p -- {' '.join(shlex.quote(d) for d in batch)}").strip()
+                    except Exception as e:
+                        error = str(e)
+                    if error:
+                        print(f"✗ Bulk mkdir failed ({error}), creating {len(batch)} directories one by one")
+                        for remote_dir in batch:
+                            try:
+                                make_remote_dir(sftp, remote_dir)
+                            except IOError as e:
+                                print(f"✗ Failed to create directory {remote_dir}: {e}")
+                                failed_count += 1
+                    batch = []
+                    batch_chars = 0
+                return failed_count
+            
+            channel_pool = queue.Queue()
+            
+            progress = {'ok': 0, 'fail': 0, 'bytes': 0, 'current': '', 'lock': threading.Lock()}
+            uploaded_sizes = {}
+            
+            def open_converted(local_item, should_convert):
+                """Return dos2unix-converted chunks for a text file, or None to upload it unchanged"""
+                if should_convert:
+                    return convert_dos2unix_stream(local_item)
+                return None
+            
+            def upload_file(local_item, remote_item, local_stat, should_convert):
+                """Upload a single file on a pooled SFTP channel, returns True if it was converted"""
+                if _stop_requested.is_set():
+                    raise InterruptedError("upload interrupted")
+                channel = channel_pool.get()
+                progress['current'] = local_item
+                try:
+                    converted_chunks = open_converted(local_item, should_convert)
+                    if converted_chunks:
+                        try:
+                            size = put_chunks_pipelined(channel, converted_chunks, remote_item)
+                        finally:
+                            converted_chunks.close()
+                    elif local_stat.st_size >= EXEC_STREAM_MIN_SIZE:
+                        size = put_via_exec(target_ssh.get_transport(), local_item, remote_item)
+                    else:
+                        size = put_pipelined(channel, local_item, remote_item)
+                    channel.utime(remote_item, (local_stat.st_atime, local_stat.st_mtime))
+                    
+                    uploaded_sizes[remote_item] = size
+                    with progress['lock']:
+                        progress['ok'] += 1
+                        progress['bytes'] += size
+                    return converted_chunks is not None
+                finally:
+                    channel_pool.put(channel)
+            
+            def put_tar_batch(batch, remote_root):
+                """Send small files as one tar stream unpacked by tar on the target, returns the size sent for each file"""
+                archive = io.BytesIO()
+                sizes = []
+                with tarfile.open(fileobj=archive, mode='w', format=tarfile.GNU_FORMAT) as tar:
+                    for local_item, remote_item, local_stat, should_convert in batch:
+                        progress['current'] = local_item
+                        converted_chunks = open_converted(local_item, should_convert)
+                        if converted_chunks:
+                            data = b''.join(converted_chunks)
+                        else:
+                            with open(local_item, 'rb') as f:
+                                data = f.read()
+                        info = tarfile.TarInfo(remote_item[len(remote_root) + 1:])
+                        info.size = len(data)
+                        info.mtime = int(local_stat.st_mtime)
+                        # like an SFTP open(), let the remote umask decide the final mode
+                        info.mode = 0o666
+                        tar.addfile(info, io.BytesIO(data))
+                        sizes.append((len(data), converted_chunks is not None))
+                
+                channel = target_ssh.get_transport().open_session()
+                channel.settimeout(UPLOAD_TIMEOUT)
+                try:
+                    channel.exec_command(f"tar --no-same-permissions -xf - -C {shlex.quote(remote_root)}")
+                    channel.sendall(archive.getvalue())
+                    channel.shutdown_write()
+                    status = wait_exit_status(channel, UPLOAD_TIMEOUT)
+                    if status != 0:
+                        error = channel.recv_stderr(4096).decode(errors='replace').strip()
+                        raise IOError(f"tar exited with status {status}: {error}")
+                finally:
+                    channel.close()
+                return sizes
+            
+            def upload_small_batch(batch, remote_root):
+                """Upload a batch of small files in one tar stream, falling back to one upload per file, returns a result or exception per file"""
+                if _stop_requested.is_set():
+                    return [InterruptedError("upload interrupted")] * len(batch)
+                try:
+                    sizes = put_tar_batch(batch, remote_root)
+                except Exception:
+                    results = []
+                    for item in batch:
+                        try:
+                            results.append(upload_file(*item))
                         except Exception as e:
-                            print(f"✗ Failed to process {item.name}: {e}")
-                            failed_count += 1
+                            results.append(e)
+                    return results
+                
+                for (_, remote_item, _, _), (size, _) in zip(batch, sizes):
+                    uploaded_sizes[remote_item] = size
+                with progress['lock']:
+                    progress['ok'] += len(batch)
+                    progress['bytes'] += sum(size for size, _ in sizes)
+                return [converted for _, converted in sizes]
+            
+            def plan_upload_tasks(files):
+                """Group new small files into tar batches and leave the rest as single uploads, returns lists of file indexes"""
+                tasks = []
+                batch = []
+                batch_bytes = 0
+                for index, (_, remote_item, local_stat, _) in enumerate(files):
+                    # tar replaces an existing file, losing its mode, so existing files are rewritten in place over SFTP
+                    if local_stat.st_size >= TAR_SMALL_FILE_SIZE or remote_item in existing_remote_files:
+                        tasks.append([index])
+                        continue
+                    batch.append(index)
+                    batch_bytes += local_stat.st_size
+                    if len(batch) >= TAR_BATCH_FILES or batch_bytes >= TAR_BATCH_BYTES:
+                        tasks.append(batch)
+                        batch = []
+                        batch_bytes = 0
+                if batch:
+                    tasks.append(batch)
+                return tasks
+            
+            def open_upload_channels(count):
+                """Fill the channel pool with count SFTP channels, opening only those the session lacks"""
+                channels = connection_cache['sftp_channels']
+                while len(channels) < count:
+                    channel = target_ssh.open_sftp()
+                    # a stalled write must fail the file instead of holding a worker forever
+                    channel.get_channel().settimeout(UPLOAD_TIMEOUT)
+                    channels.append(channel)
+                while not channel_pool.empty():
+                    channel_pool.get_nowait()
+                for channel in channels[:count]:
+                    channel_pool.put(channel)
+            
+            def upload_files_pooled(files, remote_root):
+                """Upload files on the paramiko channel pool, returns a result or exception per file"""
+                results = [None] * len(files)
+                if not files:
+                    return results
+                
+                tasks = plan_upload_tasks(files)
+                workers = min(UPLOAD_WORKERS, len(tasks))
+                open_upload_channels(workers)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {}
+                    for indexes in tasks:
+                        if len(indexes) == 1:
+                            future = executor.submit(upload_file, *files[indexes[0]])
+                        else:
+                            future = executor.submit(upload_small_batch, [files[index] for index in indexes], remote_root)
+                        futures[future] = indexes
+                    
+                    for future in as_completed(futures):
+                        indexes = futures[future]
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            outcome = e
+                        if len(indexes) == 1:
+                            results[indexes[0]] = outcome
+                        else:
+                            for index, result in zip(indexes, outcome):
+                                results[index] = result
+                return results
+            
+            async def upload_files_asyncssh(files):
+                """Upload files over one asyncssh SFTP session with many requests in flight"""
+                jump_host, jump_user, target_host, target_user = connection_cache['login']
+                compression_algs = ('zlib@openssh.com', 'none') if SSH_COMPRESS else ('none',)
+                limit = asyncio.Semaphore(ASYNCSSH_CONCURRENT_FILES)
+                
+                async with asyncssh.connect(jump_host, username=jump_user, password=connection_cache['jump_password'],
+                                            known_hosts=None) as jump, \
+                        jump.connect_ssh(target_host, username=target_user, password=connection_cache['target_password'],
+                                         known_hosts=None, compression_algs=compression_algs) as target, \
+                        target.start_sftp_client() as async_sftp:
+                    
+                    async def upload_one(local_item, remote_item, local_stat, should_convert):
+                        async with limit:
+                            if _stop_requested.is_set():
+                                raise InterruptedError("upload interrupted")
+                            progress['current'] = local_item
+                            converted_chunks = await asyncio.to_thread(open_converted, local_item, should_convert)
+                            if converted_chunks:
+                                size = 0
+                                try:
+                                    async with async_sftp.open(remote_item, 'wb') as remote_file:
+                                        while True:
+                                            chunk = await asyncio.to_thread(next, converted_chunks, None)
+                                            if chunk is None:
+                                                break
+                                            await remote_file.write(chunk)
+                                            size += len(chunk)
+                                finally:
+                                    converted_chunks.close()
+                            else:
+                                await async_sftp.put(local_item, remote_item, block_size=UPLOAD_CHUNK_SIZE,
+                                                     max_requests=ASYNCSSH_MAX_REQUESTS)
+                                size = local_stat.st_size
+                            await async_sftp.utime(remote_item, (local_stat.st_atime, local_stat.st_mtime))
                             
-                except Exception as e:
-                    print(f"✗ Error during directory traversal: {e}")
-                    failed_count += 1
+                            uploaded_sizes[remote_item] = size
+                            with progress['lock']:
+                                progress['ok'] += 1
+                                progress['bytes'] += size
+                            return converted_chunks is not None
+                    
+                    return await asyncio.gather(*(upload_one(*item) for item in files), return_exceptions=True)
+            
+            def hash_file(local_item):
+                """SHA-1 of a local file's content"""
+                digest = hashlib.sha1()
+                with open(local_item, 'rb') as f:
+                    while True:
+                        chunk = f.read(UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                return digest.hexdigest()
+            
+            def split_duplicates(files):
+                """Separate files that repeat an earlier file's content, hashing only files whose sizes collide"""
+                unique = []
+                duplicates = []
+                by_size = {}
+                for item in files:
+                    # a small file costs a few bytes in a tar batch but a cp and touch on the server as a duplicate
+                    if item[2].st_size < TAR_SMALL_FILE_SIZE:
+                        unique.append(item)
+                    else:
+                        by_size.setdefault(item[2].st_size, []).append(item)
+                
+                for group in by_size.values():
+                    if len(group) == 1:
+                        unique.extend(group)
+                        continue
+                    
+                    seen = {}
+                    for item in group:
+                        try:
+                            # conversion depends on the extension, so only same-kind files can share content
+                            key = (item[3], hash_file(item[0]))
+                        except OSError:
+                            unique.append(item)
+                            continue
+                        if key in seen:
+                            duplicates.append((item, seen[key]))
+                        else:
+                            seen[key] = item
+                            unique.append(item)
+                return unique, duplicates
+            
+            def copy_duplicates_remotely(duplicates):
+                """Copy duplicate files from their already uploaded twin on the server, returns the indexes that failed"""
+                failed = []
+                batch = []
+                batch_indexes = []
+                batch_chars = 0
+                for index, ((_, remote_item, local_stat, _), (_, source_item, _, _)) in enumerate(duplicates):
+                    batch.append(f"cp -f -- {shlex.quote(source_item)} {shlex.quote(remote_item)} && "
+                                 f"touch -m -d @{int(local_stat.st_mtime)} -- {shlex.quote(remote_item)} || echo {DUP_FAILED_MARKER} {index}")
+                    batch_indexes.append(index)
+                    batch_chars += len(batch[-1]) + 1
+                    if batch_chars < REMOTE_BATCH_CHARS and index < len(duplicates) - 1:
+                        continue
+                    
+                    # copying large files can outlast the shell's timeout, so use a channel of its own
+                    channel = target_ssh.get_transport().open_session()
+                    try:
+                        channel.exec_command('/bin/sh')
+                        channel.sendall('\n'.join(batch).encode() + b'\n')
+                        channel.shutdown_write()
+                        for line in channel.makefile('rb'):
+                            marker, _, failed_index = line.decode(errors='replace').partition(' ')
+                            if marker == DUP_FAILED_MARKER:
+                                failed.append(int(failed_index))
+                    except Exception:
+                        failed.extend(batch_indexes)
+                    finally:
+                        channel.close()
+                    batch = []
+                    batch_indexes = []
+                    batch_chars = 0
+                return failed
+            
+            def upload_tree(local_root, remote_root, root_listing):
+                files, new_dirs, failed_count, skipped_count = collect_upload_tree(local_root, remote_root, root_listing)
+                if new_dirs:
+                    print(f"Creating {len(new_dirs)} subdirectories...")
+                    failed_count += create_remote_dirs(new_dirs)
+                converted_count = 0
+                deduplicated_count = 0
+                total_count = len(files)
+                files, duplicates = split_duplicates(files)
+                # largest first, so a big file is never the last thing keeping one worker busy
+                files.sort(key=lambda item: item[2].st_size, reverse=True)
+                total_bytes = sum(item[2].st_size for item in files)
+                
+                _stop_requested.clear()
+                previous_handler = signal.getsignal(signal.SIGINT)
+                signal.signal(signal.SIGINT, functools.partial(request_stop, previous_handler))
+                failures = []
+                stop_progress = start_progress_reporter(progress, total_count, total_bytes)
+                try:
+                    results = None
+                    if use_asyncssh:
+                        try:
+                            results = asyncio.run(upload_files_asyncssh(files))
+                        except (OSError, asyncssh.Error) as e:
+                            failures.append(f"asyncssh upload failed ({e}), fell back to paramiko")
+                            with progress['lock']:
+                                progress['ok'] = progress['bytes'] = 0
+                    if results is None:
+                        results = upload_files_pooled(files, remote_root)
+                    
+                    if _stop_requested.is_set():
+                        print(f"\n✗ Upload interrupted after {progress['ok']} files, run it again to upload the rest")
+                        raise KeyboardInterrupt
+                    
+                    uploaded_results = {}
+                    for (local_item, remote_item, _, _), result in zip(files, results):
+                        uploaded_results[remote_item] = result
+                        if isinstance(result, BaseException):
+                            failures.append(f"Failed to process {os.path.basename(local_item)}: {result}")
+                            with progress['lock']:
+                                progress['fail'] += 1
+                        elif result:
+                            converted_count += 1
+                    
+                    copyable = []
+                    for duplicate, source in duplicates:
+                        if isinstance(uploaded_results[source[1]], BaseException):
+                            failures.append(f"Failed to process {os.path.basename(duplicate[0])}: identical file {os.path.basename(source[0])} was not uploaded")
+                            with progress['lock']:
+                                progress['fail'] += 1
+                        else:
+                            copyable.append((duplicate, source))
+                    
+                    failed_copies = set(copy_duplicates_remotely(copyable)) if copyable else set()
+                    for index, (duplicate, source) in enumerate(copyable):
+                        if index in failed_copies:
+                            failures.append(f"Failed to copy {os.path.basename(duplicate[0])} on the server")
+                            with progress['lock']:
+                                progress['fail'] += 1
+                            continue
+                        deduplicated_count += 1
+                        uploaded_sizes[duplicate[1]] = uploaded_sizes[source[1]]
+                        if uploaded_results[source[1]]:
+                            converted_count += 1
+                        with progress['lock']:
+                            progress['ok'] += 1
+                finally:
+                    stop_progress()
+                    signal.signal(signal.SIGINT, previous_handler)
                 
-                return uploaded_count, failed_count, converted_count
+                for failure in failures:
+                    print(f"✗ {failure}")
+                return progress['ok'], failed_count + progress['fail'], converted_count, skipped_count, deduplicated_count
+            
+            use_asyncssh = UPLOAD_BACKEND == 'asyncssh' and asyncssh is not None
+            if UPLOAD_BACKEND == 'asyncssh' and asyncssh is None:
+                print("Note: asyncssh is not installed, using the paramiko upload backend")
             
-            print(f"Starting upload with automatic dos2unix conversion...")
-            uploaded, failed, converted = upload_recursive(local_path, target_dir)
+            if use_asyncssh:
+                print(f"Starting upload with automatic dos2unix conversion (asyncssh, {ASYNCSSH_CONCURRENT_FILES} files in flight)...")
+            else:
+                print(f"Starting upload with automatic dos2unix conversion (up to {UPLOAD_WORKERS} parallel channels)...")
+            uploaded, failed, converted, skipped, deduplicated = upload_tree(local_path, target_dir, remote_listing)
             
             print(f"\n=== UPLOAD SUMMARY ===")
             print(f"✓ Successfully uploaded: {uploaded} files")
+            if skipped > 0:
+                print(f"Already up to date (skipped): {skipped} files")
+            if deduplicated > 0:
+                print(f"Duplicates copied on the server: {deduplicated} files")
             if converted > 0:
                 print(f"Files converted (dos2unix): {converted}")
             else:
@@ -429,21 +1170,30 @@ def upload_via_jump_server_continuous():
             print(f"Target location: {target_dir}")
 
             try:
-                target_ssh = connection_cache['target_ssh']
-                stdin, stdout, stderr = target_ssh.exec_command(f'ls -la "{target_dir}" | head -10')
-                verification = stdout.read().decode()
+                remote_attrs = sftp.listdir_attr(target_dir)
                 print(f"\nFirst few files in target directory:")
-                print(verification)
-
-                if converted > 0:
-                    print(f"\nVerifying line endings conversion...")
-                    text_exts = "*.txt -o -name *.sh -o -name *.py -o -name *.conf -o -name *.log"
-                    stdin, stdout, stderr = target_ssh.exec_command(f'find "{target_dir}" -type f \\( -name {text_exts} \\) | head -3 | xargs file 2>/dev/null || echo "No text files found for verification"')
-                    file_check = stdout.read().decode()
-                    if file_check.strip():
-                        print("File type verification (should show 'text' without 'CRLF'):")
-                        print(file_check)
-                        
+                for entry in remote_attrs[:10]:
+                    # longname is the server's ls -l line; fall back to paramiko's own formatting
+                    print(entry.longname or str(entry))
+                
+                mismatched = [entry.filename for entry in remote_attrs
+                              if uploaded_sizes.get(f"{target_dir}/{entry.filename}", entry.st_size) != entry.st_size]
+                if mismatched:
+                    print(f"✗ Size mismatch after upload: {', '.join(mismatched)}")
+                    return False
+                
+                # one bulk count replaces a confirming stat per uploaded file
+                remote_count = run_remote(f'find {shlex.quote(target_dir)} -type f 2>/dev/null | wc -l').strip()
+                if not remote_count.isdigit():
+                    print(f"✗ Could not count files in target directory: {remote_count}")
+                    return False
+                remote_count = int(remote_count)
+                if remote_count >= uploaded + skipped:
+                    print(f"✓ {remote_count} files present in target directory")
+                else:
+                    print(f"✗ Only {remote_count} of {uploaded + skipped} files found in target directory")
+                    return False
+            
             except Exception as e:
                 print(f"Note: Could not verify upload: {e}")
             
@@ -454,41 +1204,31 @@ def upload_via_jump_server_continuous():
             return False
     
 
+    jump_host, jump_user, target_host, target_user = get_connection_details()
+    
     while True:
         try:
-            print(f"\n{'='*50}")
+            print(f"\n{BANNER_RULE}")
             print(f"UPLOAD ATTEMPT - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"{'='*50}")
-            
-            if not connection_cache.get('jump_host'):
-                jump_host, jump_user, target_host, target_user = get_connection_details()
-                connection_cache.update({
-                    'jump_host': jump_host,
-                    'jump_user': jump_user, 
-                    'target_host': target_host,
-                    'target_user': target_user
-                })
-            else:
-                jump_host = connection_cache['jump_host']
-                jump_user = connection_cache['jump_user']
-                target_host = connection_cache['target_host'] 
-                target_user = connection_cache['target_user']
-
+            print(BANNER_RULE)
+            
+            connect_attempts = 0
             while not connection_cache['connected']:
                 print("Establishing connection...")
                 
                 if safe_connect(jump_host, jump_user, target_host, target_user):
                     break
                 else:
-                    print(f"Connection failed. Waiting 5 seconds before retry...")
-                    time.sleep(5)
+                    delay = backoff(connect_attempts, base=5.0)
+                    print(f"Connection failed. Waiting {delay:.0f} seconds before retry...")
+                    time.sleep(delay)
+                    connect_attempts += 1
 
-            try:
-                connection_cache['target_ssh'].exec_command('echo "Connection test"')
+            if is_session_alive(connection_cache):
                 print("✓ Connection is healthy")
-            except:
+            else:
                 print("Connection lost. Reconnecting...")
-                safe_disconnect()
+                safe_disconnect(keep_jump=True)
                 continue
 
             local_path = get_local_path()
@@ -497,25 +1237,17 @@ def upload_via_jump_server_continuous():
             
             if upload_success:
                 print(f"\nUPLOAD COMPLETED SUCCESSFULLY!")
-                try:
-                    exit_choice = input("\nUpload successful! Exit program? (y/n): ").strip().lower()
-                    if exit_choice in ['y', 'yes']:
-                        break
-                    else:
-                        print("Continuing for another upload...")
-                        continue
-                except KeyboardInterrupt:
-                    print("\nContinuing for another upload...")
-                    continue
+                exit_choice = input("\nUpload successful! Exit program? (y/n): ").strip().lower()
+                if exit_choice in ['y', 'yes']:
+                    break
+                print("Continuing for another upload...")
             else:
+                # the path may have been removed or lost its permissions, so check it again next time
+                connection_cache['writable_paths'].discard(target_path)
                 print(f"\nUpload failed or incomplete. Trying again...")
-                try:
-                    retry_choice = input("Retry upload? (y/n): ").strip().lower()
-                    if retry_choice not in ['y', 'yes']:
-                        break
-                except KeyboardInterrupt:
-                    print("\nRetrying upload...")
-                continue
+                retry_choice = input("Retry upload? (y/n): ").strip().lower()
+                if retry_choice not in ['y', 'yes']:
+                    break
             
         except KeyboardInterrupt:
             print(f"\n\nProgram interrupted by user (Ctrl+C)")